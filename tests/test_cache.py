@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from tranzlate.cache import TranslationCache
+
+
+class TestTranslationCache(unittest.TestCase):
+    """Test case for the TranslationCache class."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = TranslationCache(os.path.join(self.tempdir.name, "cache.sqlite3"))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tempdir.cleanup()
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get(b"key"))
+        self.cache.set(b"key", "translation")
+        self.assertEqual(self.cache.get(b"key"), "translation")
+
+    def test_persistence(self):
+        self.cache.set(b"key", "translation")
+        self.cache.close()
+        cache = TranslationCache(self.cache.path)
+        self.assertEqual(cache.get(b"key"), "translation")
+        cache.close()
+
+    def test_expiry(self):
+        self.cache.ttl = 60
+        self.cache.set(b"key", "translation")
+        self.cache.ttl = -1
+        self.assertIsNone(self.cache.get(b"key"))
+
+    def test_memory(self):
+        cache = TranslationCache(self.cache.path, memory_size=2)
+        for key in (b"a", b"b", b"c"):
+            cache.set(key, key.decode())
+        self.assertEqual(list(cache._memory), [b"b", b"c"])
+        # Evicted translations are still read from the database
+        self.assertEqual(cache.get(b"a"), "a")
+        self.assertEqual(list(cache._memory), [b"c", b"a"])
+        cache.close()
+
+    def test_set_many(self):
+        self.cache.set_many([(b"a", "A"), (b"b", "B")])
+        self.cache.close()
+        cache = TranslationCache(self.cache.path, memory_size=0)
+        self.assertEqual(cache.get(b"a"), "A")
+        self.assertEqual(cache.get(b"b"), "B")
+        cache.close()
+
+    def test_pruning(self):
+        self.cache.ttl = 60
+        self.cache.set(b"expired", "translation")
+        self.cache.set(b"key", "translation")
+        self.cache._connect().execute(
+            "UPDATE translations SET ts = ts - 120 WHERE key = ?", (b"expired",)
+        )
+        self.cache._connect().commit()
+        self.cache.close()
+        cache = TranslationCache(self.cache.path, ttl=60)
+        keys = cache._connect().execute("SELECT key FROM translations").fetchall()
+        self.assertEqual(keys, [(b"key",)])
+        cache.close()
+
+    def test_clear(self):
+        self.cache.set(b"key", "translation")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(b"key"))
+
+    def test_unusable_path(self):
+        with tempfile.NamedTemporaryFile(dir=self.tempdir.name) as file:
+            cache = TranslationCache(
+                os.path.join(file.name, "cache.sqlite3"), memory_size=0
+            )
+            cache.set(b"key", "translation")
+            self.assertIsNone(cache.get(b"key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
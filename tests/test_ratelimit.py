@@ -0,0 +1,85 @@
+import threading
+import time
+import unittest
+
+from tranzlate.ratelimit import Backoff, RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test case for the RateLimiter class."""
+
+    def test_burst(self):
+        limiter = RateLimiter(1, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_rate(self):
+        limiter = RateLimiter(20)
+        for _ in range(20):
+            limiter.acquire()
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(TypeError):
+            RateLimiter("1")
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+        with self.assertRaises(ValueError):
+            RateLimiter(1, burst=0)
+
+
+class TestBackoff(unittest.TestCase):
+    """Test case for the Backoff class."""
+
+    def elapsed_waiting(self, backoff: Backoff) -> float:
+        start = time.monotonic()
+        backoff.wait()
+        return time.monotonic() - start
+
+    def test_no_throttling(self):
+        backoff = Backoff(initial=0.1)
+        backoff.succeeded(backoff.wait())
+        self.assertLess(self.elapsed_waiting(backoff), 0.05)
+
+    def test_concurrent_throttling(self):
+        backoff = Backoff(initial=0.1, maximum=10)
+        # Requests in flight together, all throttled, delay following requests once
+        started = [backoff.wait() for _ in range(8)]
+        threads = [
+            threading.Thread(target=backoff.throttled, args=(request,))
+            for request in started
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = self.elapsed_waiting(backoff)
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.15)
+
+        # A request made after the delay, throttled again, doubles it. The success
+        # of an earlier request, which was in flight when throttling started, does not reset it.
+        request = backoff.wait()
+        backoff.succeeded(started[0])
+        backoff.throttled(request)
+        self.assertGreaterEqual(self.elapsed_waiting(backoff), 0.15)
+
+        # The success of a request made after the delay resets it
+        backoff.succeeded(backoff.wait())
+        backoff.throttled(backoff.wait())
+        self.assertLess(self.elapsed_waiting(backoff), 0.15)
+
+    def test_maximum(self):
+        backoff = Backoff(initial=0.05, maximum=0.1)
+        for _ in range(5):
+            backoff.throttled(backoff.wait())
+        self.assertLess(self.elapsed_waiting(backoff), 0.15)
+
+
+if __name__ == "__main__":
+    unittest.main()
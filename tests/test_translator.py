@@ -1,10 +1,31 @@
+import io
+import os
+import stat
+import tempfile
 import unittest
+from unittest import mock
 from translators.server import TranslatorsServer, Tse
 from io import IOBase
 from bs4 import BeautifulSoup
 
 import tranzlate
+from tranzlate.cache import TranslationCache
 from tranzlate.exceptions import TranslationError, UnsupportedLanguageError
+import lxml.html
+from tranzlate.translator import (
+    chunks,
+    _group_texts,
+    _string_element,
+    _UNTRANSLATABLE_PATTERN,
+    _MAX_RETRY_AFTER,
+    _Retry,
+    _read_batches,
+    _cache_key,
+    _detect_language,
+    _detected_languages,
+    _language_maps,
+    _CHECKED_LANGUAGES_SIZE,
+)
 
 
 
@@ -24,6 +45,12 @@ class TestTranslator(unittest.TestCase):
         with self.assertRaises(ValueError):
             tranzlate.Translator("invalid_engine")
 
+    def test_invalid_rate_limit(self):
+        with self.assertRaisesRegex(TypeError, "rate_limit"):
+            tranzlate.Translator(rate_limit="5")
+        with self.assertRaisesRegex(ValueError, "rate_limit"):
+            tranzlate.Translator(rate_limit=0)
+
     def test_detect_language(self):
         result = self.translator.detect_language(self.example_text)
         self.assertIsInstance(result, dict)
@@ -95,6 +122,12 @@ class TestTranslator(unittest.TestCase):
         self.assertFalse(self.translator.supports_pair("en", "en"))
         self.assertTrue(self.translator.supports_pair("en", "yo"))
 
+    def test_supports_pair_invalid_type(self):
+        with self.assertRaises(TypeError):
+            self.translator.supports_pair(None, "en")
+        with self.assertRaises(TypeError):
+            self.translator.supports_pair("en", 1)
+
     def test_properties(self):
         self.assertIsInstance(self.translator.server, TranslatorsServer)
         self.assertIsInstance(self.translator.engine, Tse)
@@ -126,6 +159,284 @@ class TestTranslator(unittest.TestCase):
         with self.assertRaises(TypeError):
             self.translator.translate_soup(None, "en", "yo")
 
+    def test_chunks(self):
+        text = self.example_text * 100
+        text_chunks = list(chunks(text, 100))
+        self.assertEqual("".join(text_chunks), text)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in text_chunks))
+        self.assertEqual(list(chunks("hello world", 8)), ["hello ", "world"])
+        self.assertEqual(list(chunks("helloworld", 5)), ["hello", "world"])
+
+    def test_group_texts(self):
+        texts = ["a"] * 5
+        self.assertEqual(list(_group_texts(texts, 1000, 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(
+            list(_group_texts(["a" * 10, "b", "c"], 5, 25)), [[0], [1], [2]]
+        )
+
+    def test_untranslatable_pattern(self):
+        for text in (
+            "123",
+            " - ",
+            "$5.00",
+            "https://example.com/a?b=c",
+            "www.example.com",
+            "ade@example.com",
+        ):
+            self.assertTrue(_UNTRANSLATABLE_PATTERN.match(text), text)
+        for text in ("Hello", "Visit https://example.com", "5 apples", "e-mail"):
+            self.assertFalse(_UNTRANSLATABLE_PATTERN.match(text), text)
+
+    def test_translate_markup_encodings(self):
+        translator = tranzlate.Translator(cache=False)
+        translator._request_translation = lambda text, *args, **kwargs: text.upper()
+        translator.check_languages = lambda src_lang, target_lang: (
+            src_lang,
+            target_lang,
+        )
+        for encoding in ("latin-1", "utf-16-le", "mac_roman"):
+            markup = "<p>café</p>".encode(encoding)
+            translation = translator.translate_markup(
+                markup, "fr", "en", encoding=encoding
+            )
+            self.assertIn("<p>CAFÉ</p>", translation.decode(encoding))
+
+        markup = "<!DOCTYPE html><p>café</p>".encode("utf-16")
+        translation = translator.translate_markup(markup, "fr", "en", encoding="utf-16")
+        self.assertEqual(
+            translation.decode("utf-16"),
+            "<!DOCTYPE html>\n<html><body><p>CAFÉ</p></body></html>",
+        )
+        markup = "<p>café</p>".encode("utf-16")
+        translation = translator.translate_markup(markup, "fr", "en", encoding="utf-16")
+        self.assertEqual(
+            translation.decode("utf-16"), "<html><body><p>CAFÉ</p></body></html>"
+        )
+
+        translator._request_translation = lambda text, *args, **kwargs: "日本"
+        markup = "<p>café</p>".encode("latin-1")
+        translation = translator.translate_markup(
+            markup, "en", "ja", encoding="latin-1"
+        )
+        self.assertIn(b"<p>&#26085;&#26412;</p>", translation)
+
+    def test_retry_after_is_capped(self):
+        class Response:
+            headers = {"Retry-After": "86400"}
+
+        self.assertEqual(_Retry(total=3).get_retry_after(Response()), _MAX_RETRY_AFTER)
+        Response.headers = {}
+        self.assertIsNone(_Retry(total=3).get_retry_after(Response()))
+
+    def test_string_element(self):
+        root = lxml.html.fromstring(
+            "<div><p><em>Hi</em></p><p>a<b>b</b></p><p><!--c--></p></div>"
+        )
+        first, second, third = root
+        self.assertIs(_string_element(first), first[0])
+        self.assertIsNone(_string_element(second))
+        self.assertIsNone(_string_element(third))
+
+
+class TestTranslatorOffline(unittest.TestCase):
+    """Test case for the Translator class, with requests to the engine stubbed."""
+
+    def setUp(self):
+        self.requests = []
+        self.translator = tranzlate.Translator(cache=False)
+        self.translator.check_languages = lambda src_lang, target_lang: (
+            src_lang,
+            target_lang,
+        )
+        self.translator._engine_api = self.engine_api
+
+    def engine_api(self, query_text, to_language, from_language, **kwargs):
+        self.requests.append(query_text)
+        return query_text.upper()
+
+    def seed_language_map(self, language_map):
+        """Sets the language map of the (bing) engine for the duration of the test"""
+        key = (tranzlate.Translator._server, "bing")
+        original = _language_maps.get(key)
+        _language_maps[key] = language_map
+        if original is None:
+            self.addCleanup(_language_maps.pop, key, None)
+        else:
+            self.addCleanup(_language_maps.__setitem__, key, original)
+
+    def test_read_batches(self):
+        file = io.StringIO("ab\ncd\nef\n" + "x" * 12 + "\ngh\n")
+        self.assertEqual(
+            list(_read_batches(file, 6)),
+            ["ab\ncd\n", "ef\n", "xxxxxx", "xxxxxx", "\n", "gh\n"],
+        )
+
+    def test_translate_file_stream(self):
+        content = "".join(f"line {index}\n" for index in range(50))
+        self.translator._input_limit = 30
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "test_file.txt")
+            with open(filepath, "w") as file:
+                file.write(content)
+            os.chmod(filepath, 0o644)
+
+            self.translator.translate_file(filepath, "en", "fr").close()
+            with open(filepath) as file:
+                self.assertEqual(file.read(), content.upper())
+            self.assertEqual(stat.S_IMODE(os.stat(filepath).st_mode), 0o644)
+            self.assertGreater(len(self.requests), 1)
+            self.assertTrue(all(len(text) <= 30 for text in self.requests))
+            self.assertEqual(os.listdir(directory), ["test_file.txt"])
+
+    def test_translate_file_stream_failure(self):
+        content = "".join(f"line {index}\n" for index in range(50))
+        self.translator._input_limit = 30
+
+        def engine_api(query_text, **kwargs):
+            if self.requests:
+                raise RuntimeError("Translation failed")
+            return self.engine_api(query_text, **kwargs)
+
+        self.translator._engine_api = engine_api
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "test_file.txt")
+            with open(filepath, "w") as file:
+                file.write(content)
+
+            with self.assertRaises(TranslationError):
+                self.translator.translate_file(filepath, "en", "fr")
+            with open(filepath) as file:
+                self.assertEqual(file.read(), content)
+            self.assertEqual(os.listdir(directory), ["test_file.txt"])
+
+    def test_translate_batch(self):
+        texts = ["one", "two", "three"]
+        translations = self.translator._translate_batch(texts, "en", "fr")
+        self.assertEqual(translations, ["ONE", "TWO", "THREE"])
+        self.assertEqual(len(self.requests), 1)
+
+    def test_translate_batch_mismatch(self):
+        def engine_api(query_text, **kwargs):
+            # Separators are lost in translation
+            return self.engine_api(query_text, **kwargs).replace("⟦¶⟧", "")
+
+        self.translator._engine_api = engine_api
+        texts = ["one", "two", "three"]
+        translations = self.translator._translate_batch(texts, "en", "fr")
+        self.assertEqual(translations, ["ONE", "TWO", "THREE"])
+        self.assertEqual(len(self.requests), 4)
+
+    def test_translate_batch_failure(self):
+        def engine_api(query_text, **kwargs):
+            self.requests.append(query_text)
+            raise RuntimeError("Translation failed")
+
+        self.translator._engine_api = engine_api
+        texts = ["one", "two", "three"]
+        translations = self.translator._translate_batch(texts, "en", "fr")
+        self.assertEqual(translations, [None, None, None])
+        self.assertEqual(len(self.requests), 1)
+
+
+    def test_cache_key_options(self):
+        key = _cache_key("bing", "en", "fr", "Hello")
+        self.assertEqual(_cache_key("bing", "en", "fr", "Hello", {"timeout": 5}), key)
+        self.assertNotEqual(
+            _cache_key("bing", "en", "fr", "Hello", {"professional_field": "it"}), key
+        )
+        self.assertEqual(
+            _cache_key("bing", "en", "fr", "Hello", {"a": 1, "b": 2}),
+            _cache_key("bing", "en", "fr", "Hello", {"b": 2, "a": 1}),
+        )
+
+
+    def test_detect_language_memo(self):
+        requests = []
+
+        class Server:
+            def translate_text(self, query_text, **kwargs):
+                requests.append(query_text)
+                return {"detectedLanguage": {"language": "en", "score": 1.0}}
+
+        server = Server()
+        for _ in range(2):
+            language = _detect_language(server, self.id())
+            self.assertEqual(language, {"language": "en", "score": 1.0})
+        self.assertEqual(requests, [self.id()])
+        self.assertNotIn((server, self.id()), _detected_languages)
+
+
+    def test_checked_languages(self):
+        self.seed_language_map({"en": [f"l{index}" for index in range(100)]})
+        translator = tranzlate.Translator(cache=False)
+        self.assertEqual(translator.check_languages("EN", "L1"), ("en", "l1"))
+        self.assertEqual(translator.check_languages(" en", "l1 "), ("en", "l1"))
+        self.assertEqual(translator._checked_languages, {("en", "l1")})
+        for index in range(100):
+            translator.check_languages("en", f"l{index}")
+        self.assertLessEqual(
+            len(translator._checked_languages), _CHECKED_LANGUAGES_SIZE
+        )
+
+    def test_language_map_fetch_failure(self):
+        language_map = {"en": ["fr"], "fr": ["en"]}
+        available = False
+
+        def get_language_map(server, engine_name):
+            if not available:
+                raise RuntimeError("Network is unreachable")
+            return language_map
+
+        with mock.patch("tranzlate.translator._get_language_map", get_language_map):
+            translator = tranzlate.Translator(cache=False)
+            self.assertEqual(translator.language_map, {})
+            self.assertFalse(translator.supports_language("en"))
+            available = True
+            self.assertEqual(translator.language_map, language_map)
+            self.assertTrue(translator.supports_language("EN"))
+            self.assertEqual(translator.check_languages("EN", "fr"), ("en", "fr"))
+
+
+    def test_normalized_language_codes(self):
+        self.seed_language_map({"en": ["zh-Hant", "fr"], "zh-Hant": ["en"]})
+        translator = tranzlate.Translator(cache=False)
+        for code in ("zh-Hant", " zh-hant ", "ZH-HANT"):
+            self.assertEqual(translator.check_languages("EN", code), ("en", "zh-Hant"))
+            self.assertEqual(translator.check_languages(code, " en"), ("zh-Hant", "en"))
+            self.assertTrue(translator.supports_language(code))
+            self.assertTrue(translator.supports_pair("EN", code))
+            self.assertTrue(translator.supports_pair(code, "En"))
+            self.assertFalse(translator.supports_pair(code, "zh-Hant"))
+            self.assertEqual(translator.get_supported_target_languages(code), ["en"])
+        self.assertEqual(
+            translator.get_supported_target_languages(" EN "), ["zh-Hant", "fr"]
+        )
+        with self.assertRaises(UnsupportedLanguageError):
+            translator.check_languages("fr", "zh-hant")
+
+
+    def test_translate_batch_cache(self):
+        self.translator.cache = TranslationCache(":memory:")
+        self.addCleanup(self.translator.cache.close)
+        self.translator._translate_batch(["one", "two"], "en", "fr")
+        self.assertEqual(
+            self.translator.cache.get(_cache_key("bing", "en", "fr", "two")), "TWO"
+        )
+        self.requests.clear()
+        translations = self.translator._translate_batch(
+            ["three", "two", "one", "four"], "en", "fr"
+        )
+        self.assertEqual(translations, ["THREE", "TWO", "ONE", "FOUR"])
+        self.assertEqual(self.requests, ["three\n⟦¶⟧\nfour"])
+
+
+    def test_shared_backoff(self):
+        translator = tranzlate.Translator(cache=False)
+        self.assertIs(translator._backoff, self.translator._backoff)
+        self.assertIsNot(
+            tranzlate.Translator("google", cache=False)._backoff, translator._backoff
+        )
+
  
         
 if "__name__" == "__main__":
@@ -5,6 +5,7 @@ Translate text, files, markup and BeautifulSoup.
 """
 
 from .translator import Translator, add_translatable_html_tag
+from .cache import TranslationCache
 
-__all__ = ["Translator", "add_translatable_html_tag"]
+__all__ = ["Translator", "TranslationCache", "add_translatable_html_tag"]
 __version__ = "1.0.0"
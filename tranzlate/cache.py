@@ -0,0 +1,236 @@
+"""
+Persistent, SQLite-backed cache for translations.
+
+Translations are looked up in the cache before a request is sent to the
+translation engine, so repeated inputs never leave the machine.
+"""
+
+import collections
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Iterable, Optional, OrderedDict, Tuple
+
+
+__all__ = ["TranslationCache", "get_default_cache"]
+
+DEFAULT_TTL = 14 * 86400
+"""Default number of seconds a cached translation remains valid (14 days)"""
+
+DEFAULT_MEMORY_SIZE = 4096
+"""Default number of translations kept in memory, in front of the database"""
+
+# Number of translations stored between removals of expired ones from the database
+_PRUNE_INTERVAL = 1024
+
+
+def _user_cache_dir() -> str:
+    """Returns the platform's per-user cache directory"""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        return os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+    if sys.platform == "darwin":
+        return os.path.join(home, "Library", "Caches")
+    return os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+
+
+def _default_cache_path() -> str:
+    """Returns the path to the default cache database file"""
+    return os.path.join(_user_cache_dir(), "tranzlate", "translations.sqlite3")
+
+
+class TranslationCache(object):
+    """
+    A persistent cache of translations, stored in an SQLite database.
+
+    The most recently used translations are also kept in memory, such that
+    repeated lookups do not query the database. Expired translations are removed
+    from the database when it is opened, and periodically while translations are
+    stored, such that it does not grow indefinitely. The cache is safe to use across
+    threads. Any error encountered while reading from or writing to the cache is
+    ignored, such that a broken cache never prevents a translation from being
+    carried out.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        memory_size: int = DEFAULT_MEMORY_SIZE,
+    ):
+        """
+        Create a TranslationCache instance.
+
+        :param path (str, optional): Path to the cache database file. Defaults to
+        "tranzlate/translations.sqlite3" in the platform's per-user cache directory
+        (e.g. "~/.cache" on Linux).
+        Use ":memory:" for a non-persistent cache.
+        :param ttl (float, optional): Number of seconds a cached translation remains valid.
+        Defaults to 14 days. If None, cached translations never expire.
+        :param memory_size (int, optional): Maximum number of translations kept in memory,
+        in front of the database. Defaults to 4096. If 0, translations are not kept in memory.
+        """
+        self.path = path or _default_cache_path()
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: OrderedDict[bytes, Tuple[str, float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._writes = 0
+        return None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the cache's database connection, creating it if necessary"""
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            # With a write-ahead log, commits need not wait for the disk (fsync).
+            # A crash may then lose the latest translations, but never corrupts the cache.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS translations "
+                "(key BLOB PRIMARY KEY, value TEXT NOT NULL, ts REAL NOT NULL)"
+            )
+            self._prune(connection)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Removes expired translations from the database, without committing"""
+        self._writes = 0
+        if self.ttl is None:
+            return None
+        connection.execute(
+            "DELETE FROM translations WHERE ts < ?", (time.time() - self.ttl,)
+        )
+        return None
+
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        Returns the cached translation for the key, or None if there is none.
+
+        :param key (bytes): The cache key.
+        """
+        try:
+            with self._lock:
+                row = self._memory.get(key)
+                if row is not None:
+                    self._memory.move_to_end(key)
+                else:
+                    row = (
+                        self._connect()
+                        .execute(
+                            "SELECT value, ts FROM translations WHERE key = ?", (key,)
+                        )
+                        .fetchone()
+                    )
+                    if row is not None:
+                        self._remember(key, *row)
+        except (sqlite3.Error, OSError):
+            return None
+
+        if row is None:
+            return None
+        value, ts = row
+        if self.ttl is not None and time.time() - ts > self.ttl:
+            return None
+        return value
+
+    def set(self, key: bytes, value: str) -> None:
+        """
+        Store a translation in the cache.
+
+        :param key (bytes): The cache key.
+        :param value (str): The translation.
+        """
+        ts = time.time()
+        try:
+            with self._lock:
+                self._remember(key, value, ts)
+                connection = self._connect()
+                connection.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, ts) VALUES (?, ?, ?)",
+                    (key, value, ts),
+                )
+                self._writes += 1
+                if self._writes >= _PRUNE_INTERVAL:
+                    self._prune(connection)
+                connection.commit()
+        except (sqlite3.Error, OSError):
+            pass
+        return None
+
+    def set_many(self, items: Iterable[Tuple[bytes, str]]) -> None:
+        """
+        Store multiple translations in the cache, in a single transaction.
+
+        :param items (Iterable[Tuple[bytes, str]]): Pairs of cache keys and translations.
+        """
+        ts = time.time()
+        rows = [(key, value, ts) for key, value in items]
+        if not rows:
+            return None
+        try:
+            with self._lock:
+                for key, value, _ in rows:
+                    self._remember(key, value, ts)
+                connection = self._connect()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO translations (key, value, ts) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._writes += len(rows)
+                if self._writes >= _PRUNE_INTERVAL:
+                    self._prune(connection)
+                connection.commit()
+        except (sqlite3.Error, OSError):
+            pass
+        return None
+
+    def _remember(self, key: bytes, value: str, ts: float) -> None:
+        """Keeps the translation in memory, evicting the least recently used translations"""
+        if self.memory_size <= 0:
+            return None
+        self._memory[key] = (value, ts)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+        return None
+
+    def clear(self) -> None:
+        """Remove all translations from the cache"""
+        try:
+            with self._lock:
+                self._memory.clear()
+                connection = self._connect()
+                connection.execute("DELETE FROM translations")
+                connection.commit()
+        except (sqlite3.Error, OSError):
+            pass
+        return None
+
+    def close(self) -> None:
+        """Close the cache's database connection"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+        return None
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> TranslationCache:
+    """Returns the (global) translation cache shared by all translators by default"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TranslationCache()
+    return _default_cache
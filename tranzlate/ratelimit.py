@@ -0,0 +1,137 @@
+"""
+Thread-safe rate limiting of, and backoff between, requests to translation engines.
+"""
+
+import math
+import threading
+import time
+from typing import Optional
+
+
+__all__ = ["RateLimiter", "Backoff"]
+
+
+class RateLimiter(object):
+    """
+    A token bucket limiting the rate at which requests are made.
+
+    Tokens are replenished continuously at `rate` tokens per second, up to `burst` tokens.
+    Each request takes a token, waiting only if none is available, such that requests
+    are never delayed while the rate is not exceeded.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        Create a RateLimiter instance.
+
+        :param rate (float): Maximum (sustained) number of requests per second.
+        :param burst (int, optional): Maximum number of requests that can be made at once,
+        without waiting. Defaults to the rate, rounded up, or 1.
+        """
+        if not isinstance(rate, (int, float)) or isinstance(rate, bool):
+            raise TypeError("Invalid type for `rate`")
+        if rate <= 0:
+            raise ValueError("`rate` must be greater than 0")
+        if burst is None:
+            burst = max(1, math.ceil(rate))
+        elif not isinstance(burst, int) or isinstance(burst, bool):
+            raise TypeError("Invalid type for `burst`")
+        elif burst < 1:
+            raise ValueError("`burst` must be greater than 0")
+
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        return None
+
+    def acquire(self) -> None:
+        """Take a token, waiting until one is available, if necessary"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # A missing token is borrowed from the future, reserving this caller's slot,
+            # such that waiting happens outside the lock, concurrently with other callers.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return None
+
+
+class Backoff(object):
+    """
+    An exponential backoff, shared by concurrent requests.
+
+    Once a request is throttled, following requests wait before being made.
+    The delay doubles each time a request made after the previous (backoff) delay
+    is throttled again, up to `maximum` seconds, and is reset once such a request
+    succeeds. Requests which were already in flight when throttling started do not
+    affect the delay, such that a burst of throttled requests counts only once.
+    Requests never wait otherwise.
+    """
+
+    def __init__(self, initial: float = 1.0, maximum: float = 60.0):
+        """
+        Create a Backoff instance.
+
+        :param initial (float, optional): Delay, in seconds, after the first throttled request.
+        Defaults to 1.
+        :param maximum (float, optional): Maximum delay, in seconds. Defaults to 60.
+        """
+        if initial <= 0:
+            raise ValueError("`initial` must be greater than 0")
+        if maximum < initial:
+            raise ValueError("`maximum` cannot be less than `initial`")
+
+        self.initial = initial
+        self.maximum = maximum
+        self._delay = 0.0
+        # When the current delay started, and until when requests wait
+        self._since = float("-inf")
+        self._until = 0.0
+        self._lock = threading.Lock()
+        return None
+
+    def wait(self) -> float:
+        """
+        Wait until requests may be made again, if requests are being throttled.
+
+        :return: The (monotonic) time at which the request may be made. It should be passed
+        to `throttled` or `succeeded`, once the outcome of the request is known.
+        """
+        with self._lock:
+            wait = self._until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return time.monotonic()
+
+    def throttled(self, started: float) -> None:
+        """
+        Record that a request was throttled, delaying following requests.
+
+        :param started (float): The time the request was made at, as returned by `wait`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if started >= self._since or now >= self._until:
+                self._delay = min(self.maximum, self._delay * 2 or self.initial)
+                self._since = now
+                self._until = now + self._delay
+        return None
+
+    def succeeded(self, started: float) -> None:
+        """
+        Record that a request succeeded, resetting the delay if the request
+        was made after throttling started.
+
+        :param started (float): The time the request was made at, as returned by `wait`.
+        """
+        with self._lock:
+            if started >= self._since:
+                self._delay = 0.0
+        return None
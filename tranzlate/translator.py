@@ -2,83 +2,299 @@
 Translate text, markup content, BeautifulSoup objects and files using the `translators` package.
 """
 
+import codecs
 import functools
 import sys
-from typing import Callable, Dict, Generator, List, Optional, Tuple, IO, Any, Union
-import time
-import random
+import os
+import collections
+import shutil
+import tempfile
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    OrderedDict,
+    Set,
+    Tuple,
+    IO,
+    Any,
+    Union,
+)
+import re
 from translators.server import TranslatorsServer, tss, Tse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import simple_file_handler as sfh
-import itertools
-from asgiref.sync import sync_to_async
-import asyncio
-import textwrap
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 from .exceptions import TranslationError, UnsupportedLanguageError
+from .cache import TranslationCache, get_default_cache
+from .ratelimit import Backoff, RateLimiter
+
+try:
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
+except ImportError:
+    BeautifulSoup = None
+    Tag = None
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
 
 
 __all__ = ["Translator", "add_translatable_html_tag"]
 
-_translatable_tags = (
-    "h1",
-    "u",
-    "s",
-    "abbr",
-    "del",
-    "pre",
-    "h5",
-    "sub",
-    "kbd",
-    "li",
-    "dd",
-    "textarea",
-    "dt",
-    "input",
-    "em",
-    "sup",
-    "label",
-    "button",
-    "h6",
-    "title",
-    "dfn",
-    "th",
-    "acronym",
-    "cite",
-    "samp",
-    "td",
-    "p",
-    "ins",
-    "big",
-    "caption",
-    "bdo",
-    "var",
-    "h3",
-    "tt",
-    "address",
-    "h4",
-    "legend",
-    "i",
-    "small",
-    "b",
-    "q",
-    "option",
-    "code",
-    "h2",
-    "a",
-    "strong",
-    "span",
+_translatable_tags = frozenset(
+    {
+        "h1",
+        "u",
+        "s",
+        "abbr",
+        "del",
+        "pre",
+        "h5",
+        "sub",
+        "kbd",
+        "li",
+        "dd",
+        "textarea",
+        "dt",
+        "input",
+        "em",
+        "sup",
+        "label",
+        "button",
+        "h6",
+        "title",
+        "dfn",
+        "th",
+        "acronym",
+        "cite",
+        "samp",
+        "td",
+        "p",
+        "ins",
+        "big",
+        "caption",
+        "bdo",
+        "var",
+        "h3",
+        "tt",
+        "address",
+        "h4",
+        "legend",
+        "i",
+        "small",
+        "b",
+        "q",
+        "option",
+        "code",
+        "h2",
+        "a",
+        "strong",
+        "span",
+    }
+)
+
+
+_MARKUP_FILETYPES = ("xhtml", "htm", "shtml", "html", "xml")
+
+DEFAULT_BATCH_SIZE = 25
+"""Default maximum number of strings translated in a single (batched) request"""
+
+_CACHE_KEY_VERSION = "v3"
+
+# Keyword arguments to the translation engine which change how a translation is
+# requested, but not the translation itself, hence are not part of cache keys
+_TRANSPORT_OPTIONS = frozenset(
+    {
+        "timeout",
+        "proxies",
+        "sleep_seconds",
+        "update_session_after_freq",
+        "update_session_after_seconds",
+        "if_print_warning",
+        "if_use_cn_host",
+        "reset_host_url",
+        "if_check_reset_host_url",
+        "if_show_time_stat",
+        "show_time_stat_precision",
+        "if_ignore_empty_query",
+        "if_ignore_limit_of_length",
+        "limit_of_length",
+        "is_detail_result",
+    }
+)
+
+# Maximum number of seconds a request waits, as asked by a response's "Retry-After" header,
+# before it is retried. Longer throttling is handled by the translator's backoff.
+_MAX_RETRY_AFTER = 10.0
+
+_MISSING = object()
+
+# Maximum number of checked language pairs remembered by a translator
+_CHECKED_LANGUAGES_SIZE = 64
+
+# Matches text which need not be sent to the translation engine: text without letters
+# (only whitespace, digits, punctuation and symbols), URLs and email addresses
+_UNTRANSLATABLE_PATTERN = re.compile(
+    r"^(?:[\d\W_]*|\s*(?:(?:[a-z][a-z\d+.-]*://|www\.)\S+|[\w.+-]+@[\w-]+(?:\.[\w-]+)+)\s*)$",
+    re.IGNORECASE,
 )
 
+# Matches the last whitespace character in the searched range
+_LAST_WHITESPACE_PATTERN = re.compile(r"\s\S*\Z")
+
+# Separates texts joined into a single translation request.
+# A rare character is used so that engines leave it untranslated
+_BATCH_SEPARATOR = "\n⟦¶⟧\n"
+_BATCH_SEPARATOR_PATTERN = re.compile(r"\s*⟦¶⟧\s*")
+
 
 def add_translatable_html_tag(tag: str) -> None:
     """Add a new HTML tag name to the global list of translatable HTML elements"""
     global _translatable_tags
-    if tag in _translatable_tags:
-        return
-    _translatable_tags = (tag, *_translatable_tags)
+    _translatable_tags |= {tag}
     return None
 
 
+def _is_translatable_tag(tag) -> bool:
+    """
+    Returns True if the tag is a translatable HTML element with a translatable string.
+
+    Used as the `name` filter for `find_all`, as bs4 compares a tag's name
+    against an iterable of names one at a time, not by hashing. Checking the
+    string here also saves a second pass over the matched tags.
+    """
+    if tag.name not in _translatable_tags:
+        return False
+    string = tag.string
+    return bool(string) and not _UNTRANSLATABLE_PATTERN.match(string)
+
+
+_language_maps: Dict[Tuple[TranslatorsServer, str], Dict] = {}
+_language_map_locks: Dict[Tuple[TranslatorsServer, str], threading.Lock] = {}
+_language_map_locks_lock = threading.Lock()
+
+
+def _get_language_map(server: TranslatorsServer, engine_name: str) -> Dict:
+    """
+    Returns the language map of the translation engine.
+
+    Results are shared by all `Translator` instances using the same engine.
+    Concurrent calls for the same engine fetch the map only once.
+    Failed fetches raise and are therefore not cached.
+    """
+    key = (server, engine_name)
+    language_map = _language_maps.get(key)
+    if language_map is not None:
+        return language_map
+
+    with _language_map_locks_lock:
+        lock = _language_map_locks.setdefault(key, threading.Lock())
+    with lock:
+        language_map = _language_maps.get(key)
+        if language_map is None:
+            language_map = server.get_languages(engine_name)
+            _language_maps[key] = language_map
+    return language_map
+
+
+def _prefetch_language_map(server: TranslatorsServer, engine_name: str) -> None:
+    """Fetches the language map of the translation engine, ignoring any failure"""
+    try:
+        _get_language_map(server, engine_name)
+    except BaseException:
+        pass
+    return None
+
+
+_backoffs: Dict[Tuple[TranslatorsServer, str], Backoff] = {}
+_backoffs_lock = threading.Lock()
+
+
+def _get_backoff(server: TranslatorsServer, engine_name: str) -> Backoff:
+    """
+    Returns the backoff of the translation engine.
+
+    It is shared by all `Translator` instances using the same engine,
+    as the engine throttles their requests together.
+    """
+    key = (server, engine_name)
+    with _backoffs_lock:
+        backoff = _backoffs.get(key)
+        if backoff is None:
+            backoff = _backoffs[key] = Backoff()
+    return backoff
+
+
+# Maximum number of detected languages remembered
+_DETECTED_LANGUAGES_SIZE = 4096
+
+# Detected languages, keyed by digests of the texts, such that texts are not kept in memory
+_detected_languages: OrderedDict[Tuple[TranslatorsServer, bytes], Dict] = (
+    collections.OrderedDict()
+)
+_detected_languages_lock = threading.Lock()
+
+
+def _detect_language(server: TranslatorsServer, text: str) -> Dict:
+    """
+    Returns the language detected for the text by Bing.
+
+    The most recently detected languages are remembered.
+    Failed detections raise and are therefore not remembered.
+    """
+    key = (server, hashlib.blake2b(text.encode(), digest_size=16).digest())
+    with _detected_languages_lock:
+        language = _detected_languages.get(key)
+        if language is not None:
+            _detected_languages.move_to_end(key)
+            return language
+
+    result: Dict[str, Any] = server.translate_text(
+        query_text=text, translator="bing", is_detail_result=True
+    )
+    language = result.get("detectedLanguage", {})
+    with _detected_languages_lock:
+        _detected_languages[key] = language
+        while len(_detected_languages) > _DETECTED_LANGUAGES_SIZE:
+            _detected_languages.popitem(last=False)
+    return language
+
+
+def _language_map_property(func: Callable[[Any, Dict], Any]) -> property:
+    """
+    Like `functools.cached_property`, for values derived from the translator's language map,
+    which is passed to `func`. Values are not cached while the language map is empty,
+    i.e. while it cannot be fetched, such that they are derived again once it is fetched.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        value = self.__dict__.get(name, _MISSING)
+        if value is _MISSING:
+            language_map = self.language_map
+            value = func(self, language_map)
+            if language_map:
+                self.__dict__[name] = value
+        return value
+
+    return property(getter)
+
+
 class Translator(object):
     """
     Wraps around the `TranslatorServer` class from the `translators` package by UlionTse,
@@ -90,20 +306,87 @@ class Translator(object):
 
     _server = tss
 
-    def __init__(self, engine: str = "bing"):
+    def __init__(
+        self,
+        engine: str = "bing",
+        cache: Union[TranslationCache, bool] = True,
+        max_workers: int = 8,
+        rate_limit: Optional[float] = None,
+    ):
         """
         Create a Translator instance.
 
         :param engine (str): Name of translation engine to be used. Defaults to "bing"
         as it has been tested to be the most reliable.
+        :param cache (TranslationCache | bool, optional): Cache in which translations are stored
+        and looked up before a request is made to the translation engine. If True, the default
+        (global) cache is used. If False, translations are not cached. Defaults to True.
+        :param max_workers (int, optional): Maximum number of requests that can be made
+        to the translation engine concurrently. Defaults to 8.
+        :param rate_limit (float, optional): Maximum number of requests per second
+        made to the translation engine. Defaults to None, for no limit.
 
         #### Call `Translator.engines` to get a list of supported translation engines.
         """
         if engine not in type(self).engines():
             raise ValueError(f"Invalid translation engine: {engine}")
+        if cache is True:
+            cache = get_default_cache()
+        elif cache is False:
+            cache = None
+        elif not isinstance(cache, TranslationCache):
+            raise TypeError("Invalid type for `cache`")
+        if not isinstance(max_workers, int):
+            raise TypeError("Invalid type for `max_workers`")
+        if max_workers < 1:
+            raise ValueError("`max_workers` must be greater than 0")
+        rate_limiter = None
+        if rate_limit is not None:
+            if not isinstance(rate_limit, (int, float)) or isinstance(rate_limit, bool):
+                raise TypeError("Invalid type for `rate_limit`")
+            if rate_limit <= 0:
+                raise ValueError("`rate_limit` must be greater than 0")
+            rate_limiter = RateLimiter(rate_limit)
+
         self.engine_name = engine
+        # Resolve the engine once, rather than on every access
+        self._engine: Tse = getattr(self.server, f"_{engine}")
+        self._engine_api: Callable = getattr(self.server, engine)
+        self._input_limit: Optional[int] = getattr(self._engine, "input_limit", None)
+        self.cache: Optional[TranslationCache] = cache
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter
+        # Slows all requests to the engine down once it starts throttling them
+        self._backoff = _get_backoff(self.server, engine)
+        # The (normalized) language pairs which passed `check_languages`.
+        # Set operations are atomic, hence the set is not locked.
+        self._checked_languages: Set[Tuple[str, str]] = set()
+        if (self.server, engine) not in _language_maps:
+            # Fetch the engine's languages in the background, such that they
+            # are (likely) ready by the time the first translation is requested
+            threading.Thread(
+                target=_prefetch_language_map,
+                args=(self.server, engine),
+                name="tranzlate-prefetch",
+                daemon=True,
+            ).start()
         return None
 
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        The thread pool in which concurrent requests to the translation engine are made.
+        It is created on first use.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="tranzlate"
+                )
+        return self._executor
+
     @property
     def server(self) -> TranslatorsServer:
         """The translation server used by the Translator instance"""
@@ -114,12 +397,12 @@ class Translator(object):
     @property
     def engine(self) -> Tse:
         """The translation engine (Tse) used by the Translator instance"""
-        return getattr(self.server, f"_{self.engine_name}")
+        return self._engine
 
     @property
     def engine_api(self) -> Callable:
         """API used by the translation engine to carryout translations"""
-        return getattr(self.server, f"{self.engine_name}")
+        return self._engine_api
 
     @property
     def input_limit(self) -> Optional[int]:
@@ -127,19 +410,19 @@ class Translator(object):
         The maximum number of characters that can be translated at once.
         This is dependent on the translation engine being used.
         """
-        try:
-            return self.engine.input_limit
-        except Exception:
-            return None
+        return self._input_limit
 
-    @functools.cached_property
+    @property
     def language_map(self) -> Dict:
         """
         A dictionary containing a mapping of source language codes
         to a list of target language codes that the translation engine can translate to.
+
+        The map is empty if it cannot be fetched, in which case
+        it is fetched again on next access.
         """
         try:
-            return self.server.get_languages(self.engine_name)
+            return _get_language_map(self.server, self.engine_name)
         except BaseException:
             return {}
 
@@ -149,13 +432,95 @@ class Translator(object):
         Returns a list of language codes for source
         languages supported by the translator's engine.
         """
-        return sorted(self.language_map.keys())
+        return list(self._sorted_source_languages)
+
+    @_language_map_property
+    def _sorted_source_languages(self, language_map: Dict) -> Tuple[str, ...]:
+        """Sorted source language codes supported by the translator's engine"""
+        return tuple(sorted(language_map))
+
+    @_language_map_property
+    def _supported_source_set(self, language_map: Dict) -> FrozenSet[str]:
+        """Set of source language codes supported by the translator's engine"""
+        return frozenset(language_map)
+
+    @_language_map_property
+    def _target_sets(self, language_map: Dict) -> Dict[str, FrozenSet[str]]:
+        """Mapping of source language codes to the set of their supported target language codes"""
+        return {
+            src_lang: frozenset(target_langs)
+            for src_lang, target_langs in language_map.items()
+        }
+
+    def _targets_for(self, src_lang: str) -> FrozenSet[str]:
+        """Returns the set of target language codes supported for the source language"""
+        return self._target_sets.get(src_lang, frozenset())
+
+    @_language_map_property
+    def _language_codes(self, language_map: Dict) -> Dict[str, str]:
+        """
+        Mapping of normalized (stripped, lowercase) language codes
+        to the translator's engine (interned) language codes.
+        """
+        codes: Dict[str, str] = {}
+        for src_lang, target_langs in language_map.items():
+            for code in (src_lang, *target_langs):
+                codes.setdefault(code.strip().lower(), sys.intern(code))
+        return codes
+
+    def _normalize_language(self, lang_code: str) -> str:
+        """
+        Returns the engine's language code for the (case-insensitive) language code.
+
+        Engines' language codes are case-sensitive (e.g. "zh-Hant") and are therefore not
+        normalized themselves. Unknown language codes are returned stripped.
+        """
+        lang_code = lang_code.strip()
+        normalized = lang_code.lower()
+        if normalized == "auto":
+            return normalized
+        return self._language_codes.get(normalized, lang_code)
 
     @classmethod
     def engines(cls) -> List[str]:
         """Returns a list of supported translation engines"""
         return cls._server.translators_pool
 
+    @classmethod
+    def preload(cls, engines: Iterable[str]) -> None:
+        """
+        Fetches the language maps of the specified translation engines concurrently,
+        such that translators subsequently created for these engines do not have to.
+
+        Engines whose language map cannot be fetched are skipped. Their language map
+        is fetched again when first needed.
+
+        :param engines (Iterable[str]): Names of the translation engines.
+
+        Usage Example:
+        ```python
+        import tranzlate
+
+        tranzlate.Translator.preload(["bing", "google"])
+        bing = tranzlate.Translator("bing")
+        google = tranzlate.Translator("google")
+        ```
+        """
+        engines = list(dict.fromkeys(engines))
+        for engine in engines:
+            if engine not in cls.engines():
+                raise ValueError(f"Invalid translation engine: {engine}")
+        if not engines:
+            return None
+
+        with ThreadPoolExecutor(max_workers=len(engines)) as executor:
+            list(
+                executor.map(
+                    functools.partial(_prefetch_language_map, cls._server), engines
+                )
+            )
+        return None
+
     @classmethod
     def detect_language(cls, text: str) -> Dict:
         """
@@ -183,10 +548,8 @@ class Translator(object):
         if not text:
             raise ValueError("`text` cannot be empty")
         try:
-            result: Dict[str, Any] = cls._server.translate_text(
-                query_text=text, translator="bing", is_detail_result=True
-            )
-            return result.get("detectedLanguage", {})
+            # Return a copy so that callers cannot modify the cached result
+            return dict(_detect_language(cls._server, text))
         except Exception as exc:
             sys.stderr.write(f"Error detecting language: {exc}\n")
             return {}
@@ -202,8 +565,7 @@ class Translator(object):
         if not isinstance(lang_code, str):
             raise TypeError("Invalid type for `lang_code`")
 
-        lang_code = lang_code.strip().lower()
-        return lang_code in self.supported_languages
+        return self._normalize_language(lang_code) in self._supported_source_set
 
     def get_supported_target_languages(self, src_lang: str) -> List:
         """
@@ -215,7 +577,7 @@ class Translator(object):
         if not isinstance(src_lang, str):
             raise TypeError("Invalid type for `src_lang`")
 
-        return self.language_map.get(src_lang, [])
+        return self.language_map.get(self._normalize_language(src_lang), [])
 
     def supports_pair(self, src_lang: str, target_lang: str) -> bool:
         """
@@ -226,10 +588,14 @@ class Translator(object):
         :param target_lang (str): The target language.
         :return: True if the pair is supported, False otherwise.
         """
-        return (
-            src_lang != target_lang
-            and target_lang in self.get_supported_target_languages(src_lang)
-        )
+        if not isinstance(src_lang, str):
+            raise TypeError("Invalid type for `src_lang`")
+        if not isinstance(target_lang, str):
+            raise TypeError("Invalid type for `target_lang`")
+
+        src_lang = self._normalize_language(src_lang)
+        target_lang = self._normalize_language(target_lang)
+        return src_lang != target_lang and target_lang in self._targets_for(src_lang)
 
     def check_languages(self, src_lang: str, target_lang: str) -> Tuple[str, str]:
         """
@@ -240,6 +606,23 @@ class Translator(object):
             raise TypeError("Invalid type for `src_lang`")
         if not isinstance(target_lang, str):
             raise TypeError("Invalid type for `target_lang`")
+
+        src_lang = self._normalize_language(src_lang)
+        target_lang = self._normalize_language(target_lang)
+        pair = (src_lang, target_lang)
+        if pair in self._checked_languages:
+            return pair
+
+        self._check_languages(src_lang, target_lang)
+        if len(self._checked_languages) >= _CHECKED_LANGUAGES_SIZE:
+            self._checked_languages.clear()
+        self._checked_languages.add(pair)
+        return pair
+
+    def _check_languages(self, src_lang: str, target_lang: str) -> None:
+        """
+        Checks the (normalized) source and target language. See `check_languages`.
+        """
         if not src_lang:
             raise ValueError("A source language must be provided")
         if not target_lang:
@@ -248,24 +631,25 @@ class Translator(object):
         if src_lang == target_lang:
             raise ValueError("Source language and target language cannot be the same.")
 
-        if src_lang != "auto" and not self.supports_language(src_lang):
+        if src_lang == "auto":
+            return None
+
+        target_langs = self._target_sets.get(src_lang)
+        if target_langs is None:
             raise UnsupportedLanguageError(
                 message=f"Unsupported source language using translation engine, '{self.engine_name}'",
                 code=src_lang,
                 engine=self.engine_name,
                 code_type="source",
             )
-        if (
-            src_lang != "auto"
-            and target_lang not in self.get_supported_target_languages(src_lang)
-        ):
+        if target_lang not in target_langs:
             raise UnsupportedLanguageError(
                 message=f"Unsupported target language for source language, '{src_lang}', using translation engine, '{self.engine_name}'",
                 code=target_lang,
                 engine=self.engine_name,
                 code_type="target",
             )
-        return src_lang, target_lang
+        return None
 
     def translate(
         self,
@@ -341,33 +725,122 @@ class Translator(object):
             return text
 
         src_lang, target_lang = self.check_languages(src_lang, target_lang)
-        kwargs.pop("is_detail_result", None)
-        kwds = {**kwargs, "if_ignore_empty_query": True}
-
-        def translate(text: str) -> str:
-            """Translate text using translation engine"""
-            return self.engine_api(
-                query_text=text, to_language=target_lang, from_language=src_lang, **kwds
-            )
+        return self._translate_text_unchecked(text, src_lang, target_lang, **kwargs)
 
-        async_translate = sync_to_async(translate)
+    def _translate_text_unchecked(
+        self, text: str, src_lang: str, target_lang: str, **kwargs
+    ) -> str:
+        """
+        Translate text from `src_lang` to `target_lang`.
 
-        def translate_in_chunks(text: str, chunksize: int) -> str:
-            tasks = list(map(async_translate, chunks(text, chunksize)))
+        Assumes that `text` is a string, and that `src_lang` and `target_lang`
+        have already been checked.
+        """
+        kwargs.pop("is_detail_result", None)
+        kwargs["if_ignore_empty_query"] = True
+        input_limit = self.input_limit or 1000
+        try:
+            if len(text) <= input_limit:
+                # Most texts (tag strings, UI strings, sentences...) fit in a single request.
+                # Surrounding whitespace is kept out of the request, and the cache key,
+                # such that texts differing only by it share a cached translation.
+                return self._translate_chunk(text, src_lang, target_lang, **kwargs)
+
+            translate_chunk = functools.partial(
+                self._translate_chunk,
+                src_lang=src_lang,
+                target_lang=target_lang,
+                **kwargs,
+            )
+            # Chunks are produced lazily, as workers become available,
+            # rather than all being sliced out of the text up front
+            return "".join(self._imap(translate_chunk, chunks(text, input_limit)))
+        except Exception as exc:
+            raise TranslationError(str(exc)) from exc
 
-            async def execute_tasks() -> List[str]:
-                return await asyncio.gather(*tasks)
+    def _translate_chunk(
+        self, chunk: str, src_lang: str, target_lang: str, **kwargs
+    ) -> str:
+        """Translate chunk, retaining the whitespace separating it from other chunks"""
+        text = chunk.strip()
+        if not text:
+            return chunk
+        translation = self._translate_cached(text, src_lang, target_lang, **kwargs)
+        return _with_whitespace_of(chunk, translation)
 
-            translated_chunks = asyncio.run(execute_tasks())
-            return "".join(translated_chunks)
+    def _translate_cached(
+        self, text: str, src_lang: str, target_lang: str, **kwargs
+    ) -> str:
+        """Translate text using translation engine, reusing cached translations"""
+        if self.cache is None:
+            return self._request_translation(text, src_lang, target_lang, **kwargs)
+
+        key = _cache_key(self.engine_name, src_lang, target_lang, text, kwargs)
+        translation = self.cache.get(key)
+        if translation is None:
+            translation = self._request_translation(
+                text, src_lang, target_lang, **kwargs
+            )
+            if isinstance(translation, str):
+                self.cache.set(key, translation)
+        return translation
 
+    def _request_translation(
+        self, text: str, src_lang: str, target_lang: str, **kwargs
+    ) -> str:
+        """Sends a request to the translation engine to translate the text"""
+        started = self._backoff.wait()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        self._pool_connections()
         try:
-            input_limit = self.input_limit or 1000
-            if len(text) > input_limit:
-                return translate_in_chunks(text, input_limit)
-            return translate(text)
+            translation = self.engine_api(
+                query_text=text,
+                to_language=target_lang,
+                from_language=src_lang,
+                **kwargs,
+            )
         except Exception as exc:
-            raise TranslationError(str(exc)) from exc
+            if _is_throttled(exc):
+                self._backoff.throttled(started)
+            raise
+        self._backoff.succeeded(started)
+        # The engine may (re)create its session while handling the request
+        self._pool_connections()
+        return translation
+
+    def _pool_connections(self) -> None:
+        """
+        Mounts adapters with connection pools large enough for the executor's workers
+        on the engine's HTTP session, so that concurrent requests reuse (keep-alive)
+        connections instead of each performing a new TCP and TLS handshake.
+
+        Failed connections, and responses signalling that the engine is throttled or
+        temporarily unavailable, are retried (with backoff) by the adapters.
+        """
+        session = getattr(self.engine, "session", None)
+        if not isinstance(session, requests.Session) or getattr(
+            session, "_tranzlate_pooled", False
+        ):
+            return
+        retry = _Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            # Translation requests are idempotent, whatever their method
+            allowed_methods=None,
+            # Let the engine handle the last response, as it would without retries
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=max(32, self.max_workers),
+            max_retries=retry,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session._tranzlate_pooled = True
+        return None
 
     def translate_file(
         self, filepath: str, src_lang: str = "auto", target_lang: str = "en", **kwargs
@@ -398,24 +871,103 @@ class Translator(object):
             with sfh.FileHandler(
                 filepath, exists_ok=True, not_found_ok=False
             ) as file_handler:
-                content = file_handler.file_content
-                if not content:
+                filetype = file_handler.filetype
+                if filetype in _MARKUP_FILETYPES:
+                    if file_handler.file_size == 0:
+                        return file_handler.file
+                    _require_bs4()
+                    # Parse the markup straight from the file, and only once
+                    file_handler.open_file("r")
+                    soup = BeautifulSoup(file_handler.file, "lxml")
+                    self._translate_soup_inplace(soup, src_lang, target_lang, **kwds)
+                    file_handler.write_to_file(soup.decode(), write_mode="w+")
                     return file_handler.file
 
-                if file_handler.filetype in ("xhtml", "htm", "shtml", "html", "xml"):
-                    translation = self.translate_markup(
-                        content, src_lang, target_lang, **kwds
-                    )
-                else:
+                # Structured files (json, csv, yaml...) are read as objects.
+                # Other text files are streamed in batches.
+                if hasattr(file_handler, f"_read_{filetype}"):
+                    content = file_handler.file_content
+                    if not content:
+                        return file_handler.file
                     translation = self.translate_text(
                         content, src_lang, target_lang, **kwds
                     )
+                    file_handler.write_to_file(translation, write_mode="w+")
+                    return file_handler.file
+
+                if filetype not in file_handler.supported_types():
+                    raise ValueError(f"Unsupported file type: '{filetype}'")
+                if file_handler.file_size == 0:
+                    return file_handler.file
 
-                file_handler.write_to_file(translation, write_mode="w+")
+                self._translate_file_stream(file_handler, src_lang, target_lang, **kwds)
+                # Point the handler at the translated file which replaced the original
+                file_handler.open_file("r")
                 return file_handler.file
         except Exception as exc:
             raise TranslationError("File cannot be translated.") from exc
 
+    def _translate_file_stream(
+        self, file_handler: sfh.FileHandler, src_lang: str, target_lang: str, **kwargs
+    ) -> None:
+        """
+        Translates the handled (text) file in batches, writing the translation into
+        a temporary file which then replaces the original file.
+
+        Only a few batches are held in memory at any time, regardless of the file's size.
+        The original file is left untouched if translation fails.
+        """
+        limit = self.input_limit or 1000
+
+        def translate(batch: str) -> str:
+            text = batch.strip()
+            if not text:
+                return batch
+            translation = self._translate_text_unchecked(
+                text, src_lang, target_lang, **kwargs
+            )
+            return _with_whitespace_of(batch, translation)
+
+        file_handler.close_file()
+        destination = tempfile.NamedTemporaryFile(
+            "w",
+            encoding=file_handler.encoding,
+            dir=file_handler.file_dir,
+            prefix=f".{file_handler.filename}.",
+            suffix=".tmp",
+            delete=False,
+            buffering=1 << 20,
+        )
+        try:
+            with destination, open(
+                file_handler.filepath, "r", encoding=file_handler.encoding
+            ) as source:
+                for translation in self._imap(translate, _read_batches(source, limit)):
+                    destination.write(translation)
+            # The temporary file is only readable by its owner
+            shutil.copymode(file_handler.filepath, destination.name)
+            os.replace(destination.name, file_handler.filepath)
+        except BaseException:
+            os.unlink(destination.name)
+            raise
+        return None
+
+    def _imap(
+        self, func: Callable[[str], str], iterable: Iterable[str]
+    ) -> Generator[str, Any, None]:
+        """
+        Like `self.executor.map`, but lazily consumes `iterable`, submitting
+        at most twice as many items as there are workers ahead of the consumer.
+        Results are yielded in order.
+        """
+        pending: Deque[Future] = collections.deque()
+        for item in iterable:
+            pending.append(self.executor.submit(func, item))
+            if len(pending) >= 2 * self.max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
     def translate_tag(
         self, tag, src_lang: str = "auto", target_lang: str = "en", **kwargs
     ):
@@ -427,12 +979,11 @@ class Translator(object):
         :param target_lang (str, optional): Target language. Defaults to "en".
         :return: The translated `bs4.element.Tag`
         """
-        from bs4.element import Tag
-
+        _require_bs4()
         if not isinstance(tag, Tag):
             raise TypeError("Invalid type for `tag`")
 
-        if not (tag.string and tag.string.strip()):
+        if not tag.string or _UNTRANSLATABLE_PATTERN.match(tag.string):
             return tag
 
         translation = self.translate_text(
@@ -442,7 +993,13 @@ class Translator(object):
         return tag
 
     def translate_soup(
-        self, soup, src_lang: str = "auto", target_lang: str = "en", **kwargs
+        self,
+        soup,
+        src_lang: str = "auto",
+        target_lang: str = "en",
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        **kwargs,
     ):
         """
         Translates the text of a `BeautifulSoup` object.
@@ -451,42 +1008,150 @@ class Translator(object):
         :param src_lang (str, optional): Source language. Defaults to "auto".
         It is advisable to provide a source language to get more accurate translations.
         :param target_lang (str, optional): The target language for translation. Defaults to "en".
+        :param batch_size (int, optional): Maximum number of strings sent to the translation engine
+        in a single request. Defaults to 25.
         :return: The translated `BeautifulSoup` object.
         """
-        try:
-            from bs4 import BeautifulSoup
-        except ImportError:
-            raise ImportError(
-                '"bs4" is required to translate soup. Run `pip install beautifulsoup4` in your terminal to install it'
-            )
+        _require_bs4()
 
         if not isinstance(soup, BeautifulSoup):
             raise TypeError("Invalid type for `soup`")
+        _check_batch_size(batch_size)
 
         src_lang, target_lang = self.check_languages(src_lang, target_lang)
-        tags = soup.find_all(_translatable_tags)
-        tags = [tag for tag in tags if tag.string]
+        return self._translate_soup_inplace(
+            soup, src_lang, target_lang, batch_size=batch_size, **kwargs
+        )
 
-        def safe_translate_tag(*args, **kwargs):
-            """Ignores any exception that occurs during translation"""
-            try:
-                return self.translate_tag(*args, **kwargs)
-            except BaseException:
-                pass
+    def _translate_soup_inplace(
+        self,
+        soup,
+        src_lang: str,
+        target_lang: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        **kwargs,
+    ):
+        """
+        Translates the text of a `BeautifulSoup` object 'in place'.
+
+        Assumes that `src_lang` and `target_lang` have already been checked.
+        """
+        # Group tags by their (stripped) string, such that each
+        # distinct string is translated only once
+        tags_by_text: Dict[str, List] = {}
+        for tag in soup.find_all(_is_translatable_tag):
+            tags_by_text.setdefault(tag.string.strip(), []).append(tag)
+
+        texts = list(tags_by_text)
+        translations = self._translate_batch(
+            texts, src_lang, target_lang, batch_size=batch_size, **kwargs
+        )
+        for text, translation in zip(texts, translations):
+            if translation is None:
+                continue
+            for tag in tags_by_text[text]:
+                tag.string.replace_with(_with_whitespace_of(tag.string, translation))
+        return soup
 
-        kwds = {**kwargs, "src_lang": src_lang, "target_lang": target_lang}
-        translate_tag = functools.partial(safe_translate_tag, **kwds)
-        async_translate_tag = sync_to_async(translate_tag)
-        # Translate tags in batches to avoid making excessive requests to translation server at once
-        for batch in itertools.batched(tags, 50):
-            tasks = list(map(async_translate_tag, batch))
+    def _translate_batch(
+        self,
+        texts: List[str],
+        src_lang: str,
+        target_lang: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        **kwargs,
+    ) -> List[Optional[str]]:
+        """
+        Translates multiple texts using as few requests to the translation engine as possible.
+
+        Texts are joined with a separator, into groups of at most `batch_size` texts that fit
+        the engine's input limit, such that each group is translated in a single request.
+        If the translation of a group cannot be split back into its texts, each text in the
+        group is translated individually. If the request for a group fails, its texts are
+        left untranslated. Translations are cached per text, such that cached texts
+        are not sent again, however they were grouped before.
+
+        :param texts (List[str]): Texts to be translated.
+        :param src_lang (str): Source language. Should have been checked by the caller.
+        :param target_lang (str): Target language. Should have been checked by the caller.
+        :param batch_size (int, optional): Maximum number of texts per request. Defaults to 25.
+        :return: A list of translations, in the same order as `texts`.
+        A translation is None if the text could not be translated.
+        """
+        translations: List[Optional[str]] = [None] * len(texts)
+        limit = self.input_limit or 1000
+        kwargs.pop("is_detail_result", None)
+        kwargs["if_ignore_empty_query"] = True
 
-            async def execute_tasks() -> List[str]:
-                return await asyncio.gather(*tasks)
+        cache_key = functools.partial(
+            _cache_key, self.engine_name, src_lang, target_lang, options=kwargs
+        )
+        if self.cache is not None:
+            for index, text in enumerate(texts):
+                translations[index] = self.cache.get(cache_key(text))
+        pending = [index for index, text in enumerate(translations) if text is None]
 
-            asyncio.run(execute_tasks())
-            time.sleep(random.randint(1, 3))
-        return soup
+        def safe_translate(text: str) -> Optional[str]:
+            """Ignores any exception that occurs during translation"""
+            try:
+                return self._translate_text_unchecked(
+                    text, src_lang, target_lang, **kwargs
+                )
+            except BaseException:
+                return None
+
+        def translate_group(group: List[int]) -> None:
+            if len(group) > 1:
+                joined = _BATCH_SEPARATOR.join(texts[index] for index in group)
+                try:
+                    # Joined texts are cached individually, below, not as a whole
+                    translation = self._request_translation(
+                        joined, src_lang, target_lang, **kwargs
+                    )
+                except BaseException:
+                    # Requesting each text individually would fail likewise, only
+                    # with more requests, e.g. if the engine is throttling requests
+                    return
+                if not isinstance(translation, str):
+                    return
+                parts = _BATCH_SEPARATOR_PATTERN.split(translation.strip())
+                if len(parts) == len(group):
+                    for index, part in zip(group, parts):
+                        translations[index] = part
+                    if self.cache is not None:
+                        # Stored at once, rather than with a commit per text
+                        self.cache.set_many(
+                            (cache_key(texts[index]), part)
+                            for index, part in zip(group, parts)
+                        )
+                    return
+            # Fallback to translating each text individually,
+            # if the translation of the group cannot be split back into its texts
+            for index in group:
+                translations[index] = safe_translate(texts[index])
+
+        groups: List[List[int]] = []
+        oversized_groups: List[List[int]] = []
+        pending_texts = [texts[index] for index in pending]
+        for group in _group_texts(pending_texts, limit, batch_size):
+            group = [pending[index] for index in group]
+            if len(texts[group[0]]) > limit:
+                oversized_groups.append(group)
+            else:
+                groups.append(group)
+
+        futures = [self.executor.submit(translate_group, group) for group in groups]
+        # Texts exceeding the input limit are translated in chunks, using the executor.
+        # Translating them from within the executor could exhaust its workers and
+        # deadlock, hence they are translated here, while the groups above are in flight.
+        for group in oversized_groups:
+            translate_group(group)
+        # Retrieve the results, as they complete, so that any (unexpected) exception is raised
+        for future in as_completed(futures):
+            future.result()
+        return translations
 
     def translate_markup(
         self,
@@ -496,6 +1161,8 @@ class Translator(object):
         *,
         markup_parser: str = "lxml",
         encoding: str = "utf-8",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prettify: bool = False,
         **kwargs,
     ) -> Union[str, bytes]:
         """
@@ -507,38 +1174,309 @@ class Translator(object):
         :param target_lang (str, optional): Target language. Defaults to "en".
         :param markup_parser (str, optional): The (beautifulsoup) markup parser to use. Defaults to "lxml".
         :param encoding (str, optional): The encoding of the markup (for bytes markup only). Defaults to "utf-8".
+        :param batch_size (int, optional): Maximum number of strings sent to the translation engine
+        in a single request. Defaults to 25.
+        :param prettify (bool, optional): Whether to (re)format the translated markup with
+        beautifulsoup's `prettify`, which alters its whitespace. Defaults to False.
         :param kwargs: Keyword arguments to be passed to the translation server.
             :kwarg timeout: float, default None.
             :kwarg proxies: dict, default None.
         :return: Translated markup.
         """
-        try:
-            from bs4 import BeautifulSoup
-        except ImportError:
-            raise ImportError(
-                '"bs4" is required to translate soup. Run `pip install beautifulsoup4` in your terminal to install it'
-            )
-
         if not isinstance(markup, (str, bytes)):
             raise TypeError("Invalid type for `markup`")
+        _check_batch_size(batch_size)
+        use_lxml = markup_parser == "lxml" and lxml is not None and not prettify
+        if not use_lxml:
+            _require_bs4()
         if not markup:
             return markup
 
         is_bytes = isinstance(markup, bytes)
         kwargs.pop("is_detail_result", None)
+        src_lang, target_lang = self.check_languages(src_lang, target_lang)
+        if use_lxml:
+            translated_markup = self._translate_markup_lxml(
+                markup,
+                src_lang,
+                target_lang,
+                encoding=encoding,
+                batch_size=batch_size,
+                **kwargs,
+            )
+            if translated_markup is not None:
+                return translated_markup
+            _require_bs4()
+
         soup = BeautifulSoup(
             markup, markup_parser, from_encoding=encoding if is_bytes else None
         )
-        translated_markup = self.translate_soup(
-            soup, src_lang, target_lang, **kwargs
-        ).prettify()
-        return translated_markup.encode(encoding) if is_bytes else translated_markup
+        self._translate_soup_inplace(
+            soup, src_lang, target_lang, batch_size=batch_size, **kwargs
+        )
+        if prettify:
+            return soup.prettify(encoding) if is_bytes else soup.prettify()
+        # Serialize directly, skipping `prettify`'s costly (and whitespace altering) reformatting
+        return soup.encode(encoding) if is_bytes else soup.decode()
 
+    def _translate_markup_lxml(
+        self,
+        markup: Union[str, bytes],
+        src_lang: str,
+        target_lang: str,
+        *,
+        encoding: str = "utf-8",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        **kwargs,
+    ) -> Optional[Union[str, bytes]]:
+        """
+        Translates (HTML) markup using `lxml` directly, iterating over its elements in C,
+        rather than over BeautifulSoup's (Python) wrappers of them.
 
-def chunks(text: str, size: int) -> Generator[str, Any, None]:
-    """Yields a chunk of the text on each iteration, respecting word boundaries."""
-    wrapper = textwrap.TextWrapper(
-        width=size, break_long_words=False, replace_whitespace=False
+        Assumes that `src_lang` and `target_lang` have already been checked.
+        Returns None if `lxml` cannot parse the markup, or does not support its encoding.
+        """
+        is_bytes = isinstance(markup, bytes)
+        try:
+            source, parser = markup, _get_lxml_parser()
+            if is_bytes:
+                try:
+                    # libxml2 does not know all of Python's names (and aliases) for encodings
+                    parser = _get_lxml_parser(codecs.lookup(encoding).name)
+                except LookupError:
+                    # ...nor all of its encodings. Such markup is decoded here, instead.
+                    source = markup.decode(encoding)
+            root = lxml.html.document_fromstring(source, parser=parser)
+        except (LookupError, ValueError, lxml.etree.ParserError):
+            return None
+
+        elements_by_text: Dict[str, List] = {}
+        seen = set()
+        for element in root.iter(*_translatable_tags):
+            element = _string_element(element)
+            if element is None or element in seen:
+                continue
+            seen.add(element)
+            text = element.text
+            if not text or _UNTRANSLATABLE_PATTERN.match(text):
+                continue
+            elements_by_text.setdefault(text.strip(), []).append(element)
+
+        texts = list(elements_by_text)
+        translations = self._translate_batch(
+            texts, src_lang, target_lang, batch_size=batch_size, **kwargs
+        )
+        for text, translation in zip(texts, translations):
+            if translation is None:
+                continue
+            for element in elements_by_text[text]:
+                element.text = _with_whitespace_of(element.text, translation)
+
+        # lxml adds a (default) doctype to documents without one
+        head = markup[:1024]
+        if is_bytes:
+            head = head.decode(encoding, "ignore")
+        doctype = (
+            root.getroottree().docinfo.doctype if "<!doctype" in head.lower() else ""
+        )
+        # Serialized as text, as libxml2 may not support (the name of) the encoding
+        translated_markup = lxml.etree.tostring(
+            root.getroottree(), method="html", encoding="unicode", doctype=doctype
+        )
+        if not doctype:
+            translated_markup = translated_markup.lstrip("\n")
+        if is_bytes:
+            # Characters the encoding cannot represent are kept as character references
+            return translated_markup.encode(encoding, "xmlcharrefreplace")
+        return translated_markup
+
+
+def _cache_key(
+    engine: str,
+    src_lang: str,
+    target_lang: str,
+    text: str,
+    options: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """
+    Returns the key under which the translation of the text is cached.
+
+    The key is a 128-bit BLAKE2b digest, so keys stay small regardless of the
+    text's length. Fields are separated, so that different fields cannot produce
+    the same input, and prefixed with a version, which is bumped to invalidate
+    previously cached translations.
+
+    Options passed to the translation engine (e.g. "professional_field") are part of
+    the key, as they may change the translation, except for those only affecting how
+    the translation is requested (timeout, proxies...), listed in `_TRANSPORT_OPTIONS`.
+    """
+    key = f"{_CACHE_KEY_VERSION}|{engine}|{src_lang}|{target_lang}|{text}"
+    if options:
+        fields = sorted(
+            (name, value)
+            for name, value in options.items()
+            if name not in _TRANSPORT_OPTIONS
+        )
+        if fields:
+            key = f"{key}|{fields!r}"
+    return hashlib.blake2b(
+        key.encode(),
+        digest_size=16,
+    ).digest()
+
+
+class _Retry(Retry):
+    """Retry configuration which caps the delays asked for by "Retry-After" headers"""
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER)
+
+
+def _is_throttled(exc: BaseException) -> bool:
+    """Returns True if the exception signals that the engine is throttling requests"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        response = getattr(exc, "response", None)
+        if getattr(response, "status_code", None) == 429:
+            return True
+        message = str(exc).lower()
+        if "429" in message or "too many requests" in message:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _require_bs4() -> None:
+    """Raises an `ImportError` if "bs4" is not installed"""
+    if BeautifulSoup is None:
+        raise ImportError(
+            '"bs4" is required to translate soup. Run `pip install beautifulsoup4` in your terminal to install it'
+        )
+
+
+_lxml_parsers = threading.local()
+
+
+def _get_lxml_parser(encoding: Optional[str] = None):
+    """
+    Returns an `lxml` HTML parser for the encoding, reused by the calling thread,
+    such that a parser (context) is not set up for every markup parsed.
+    Parsers are not shared across threads, as they are not thread-safe.
+    """
+    parsers: Optional[Dict[Optional[str], Any]] = getattr(
+        _lxml_parsers, "parsers", None
     )
-    for chunk in wrapper.wrap(text):
-        yield chunk
+    if parsers is None:
+        parsers = _lxml_parsers.parsers = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        parser = parsers[encoding] = lxml.html.HTMLParser(encoding=encoding)
+    return parser
+
+
+def _string_element(element):
+    """
+    Returns the `lxml` element holding the element's only string, or None if there is none.
+
+    Mirrors bs4's `Tag.string`, which is that of the tag's only child, if the child is a tag.
+    """
+    while len(element):
+        child = element[0]
+        if (
+            len(element) > 1
+            or element.text is not None
+            or child.tail is not None
+            or not isinstance(child.tag, str)
+        ):
+            return None
+        element = child
+    return element
+
+
+def _with_whitespace_of(text: str, translation: str) -> str:
+    """Returns the translation surrounded by the leading and trailing whitespace of the text"""
+    leading = text[: len(text) - len(text.lstrip())]
+    trailing = text[len(text.rstrip()) :]
+    return f"{leading}{translation.strip()}{trailing}"
+
+
+def _check_batch_size(batch_size: int) -> None:
+    """Validates the maximum number of strings per batched request"""
+    if not isinstance(batch_size, int) or isinstance(batch_size, bool):
+        raise TypeError("Invalid type for `batch_size`")
+    if batch_size < 1:
+        raise ValueError("`batch_size` must be greater than 0")
+    return None
+
+
+def _group_texts(
+    texts: List[str], limit: int, size: int = DEFAULT_BATCH_SIZE
+) -> Generator[List[int], Any, None]:
+    """
+    Yields lists of at most `size` indices of texts which, joined with the batch
+    separator, do not exceed `limit` characters. A text longer than `limit` is yielded alone.
+    """
+    group: List[int] = []
+    length = 0
+    for index, text in enumerate(texts):
+        extra = len(text) + (len(_BATCH_SEPARATOR) if group else 0)
+        if group and (length + extra > limit or len(group) >= size):
+            yield group
+            group, length = [], 0
+            extra = len(text)
+        group.append(index)
+        length += extra
+    if group:
+        yield group
+
+
+def _read_batches(file: IO, size: int) -> Generator[str, Any, None]:
+    """
+    Yields batches of lines, read from the file, of at most `size` characters.
+    Lines longer than `size` are split into chunks (see `chunks`).
+    """
+    batch: List[str] = []
+    length = 0
+    for line in file:
+        if len(line) > size:
+            if batch:
+                yield "".join(batch)
+                batch, length = [], 0
+            yield from chunks(line, size)
+            continue
+
+        if length + len(line) > size:
+            yield "".join(batch)
+            batch, length = [], 0
+        batch.append(line)
+        length += len(line)
+    if batch:
+        yield "".join(batch)
+
+
+def chunks(text: str, size: int) -> Generator[str, Any, None]:
+    """
+    Yields a chunk of the text, of at most `size` characters, on each iteration,
+    respecting word boundaries. Chunks are cut after the last whitespace that fits,
+    such that joining the chunks gives back the text. Words longer than `size` are split.
+    """
+    start = 0
+    length = len(text)
+    while length - start > size:
+        end = start + size
+        # Reverse scans (in C) for the most common separators are much cheaper
+        # than matching the whole window. Other whitespace is only looked for
+        # when the window contains neither.
+        index = max(text.rfind(" ", start, end), text.rfind("\n", start, end))
+        if index < start:
+            match = _LAST_WHITESPACE_PATTERN.search(text, start, end)
+            index = match.start() if match else end - 1
+        cut = index + 1
+        yield text[start:cut]
+        start = cut
+    if start < length:
+        yield text[start:]